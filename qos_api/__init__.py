@@ -5,8 +5,14 @@ from .models import (
     QuoteSnapshot,
     MarketDepth,
     TradeTick,
-    KLine
+    KLine,
+    IndicatorValues
 )
+from .indicators import IndicatorEngine
+from .universe import UniverseMatrix
+from .kline_cache import KLineCache
+from .router import TransportRouter
+from .trade_tape import TradeTape
 from .exceptions import (
     QOSError,
     QOSAPIError,
@@ -27,6 +33,12 @@ __all__ = [
     'MarketDepth',
     'TradeTick',
     'KLine',
+    'IndicatorValues',
+    'IndicatorEngine',
+    'UniverseMatrix',
+    'KLineCache',
+    'TransportRouter',
+    'TradeTape',
     'QOSError',
     'QOSAPIError',
     'QOSHTTPError',
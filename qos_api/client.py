@@ -1,34 +1,48 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from .http_client import QOSHttpClient
 from .ws_client import QOSWebSocketClient
+from .router import TransportRouter
 from .models import *
 
 class QOSClient:
     """QOS行情API统一客户端"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, ws_options: Optional[Dict[str, Any]] = None,
+                 http_options: Optional[Dict[str, Any]] = None):
         """
         初始化客户端
         :param api_key: 官网注册的API Key
+        :param ws_options: WebSocket客户端参数（压缩、缓冲区、发送间隔等），见QOSWebSocketClient
+        :param http_options: HTTP客户端参数（限流器、超限时是否阻塞），见QOSHttpClient
         """
         self._api_key = api_key
+        self._ws_options = ws_options or {}
+        self._http_options = http_options or {}
         self._http_client: Optional[QOSHttpClient] = None
         self._ws_client: Optional[QOSWebSocketClient] = None
+        self._router: Optional[TransportRouter] = None
 
     @property
     def http(self) -> QOSHttpClient:
         """HTTP客户端"""
         if self._http_client is None:
-            self._http_client = QOSHttpClient(self._api_key)
+            self._http_client = QOSHttpClient(self._api_key, **self._http_options)
         return self._http_client
 
     @property
     def ws(self) -> QOSWebSocketClient:
         """WebSocket客户端"""
         if self._ws_client is None:
-            self._ws_client = QOSWebSocketClient(self._api_key)
+            self._ws_client = QOSWebSocketClient(self._api_key, **self._ws_options)
         return self._ws_client
 
+    @property
+    def router(self) -> TransportRouter:
+        """HTTP/WebSocket双通道请求路由"""
+        if self._router is None:
+            self._router = TransportRouter(self.http, self.ws)
+        return self._router
+
     # HTTP接口
     def get_instrument_info(self, codes: List[str]) -> List[InstrumentInfo]:
         """4.2 获取品种基础信息"""
@@ -50,6 +64,10 @@ class QOSClient:
         """4.6 获取K线数据"""
         return self.http.get_kline(codes, ktype, count, adjust)
 
+    def get_kline_batch(self, kline_reqs: List[Dict[str, Any]]) -> List[KLine]:
+        """4.6 获取K线数据（逐品种参数）"""
+        return self.http.get_kline_batch(kline_reqs)
+
     def get_history_kline(self, codes: List[str], ktype: int, end_time: int, count: int, adjust: int = 0) -> List[KLine]:
         """4.7 获取历史K线"""
         return self.http.get_history_kline(codes, ktype, end_time, count, adjust)
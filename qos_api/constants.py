@@ -20,6 +20,21 @@ class KLineType(Enum):
     MONTH = 1030 # 月线
     YEAR = 2001  # 年线
 
+# 各K线类型的最短周期（秒），用于估算增量刷新需要的K线数量；月、年取下界
+KLINE_PERIOD_SECONDS = {
+    KLineType.MIN1.value: 60,
+    KLineType.MIN5.value: 5 * 60,
+    KLineType.MIN15.value: 15 * 60,
+    KLineType.MIN30.value: 30 * 60,
+    KLineType.HOUR1.value: 60 * 60,
+    KLineType.HOUR2.value: 2 * 60 * 60,
+    KLineType.HOUR4.value: 4 * 60 * 60,
+    KLineType.DAY.value: 24 * 60 * 60,
+    KLineType.WEEK.value: 7 * 24 * 60 * 60,
+    KLineType.MONTH.value: 28 * 24 * 60 * 60,
+    KLineType.YEAR.value: 365 * 24 * 60 * 60
+}
+
 class TradeDirection(Enum):
     UNKNOWN = 0
     BUY = 1
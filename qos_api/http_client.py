@@ -1,18 +1,32 @@
 import requests
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Optional, Union
 from .models import *
-from .exceptions import QOSAPIError
+from .exceptions import QOSAPIError, QOSLimitError
 from .constants import BASE_URL
+from .utils import RateLimiter
 
 class QOSHttpClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, rate_limiter: Optional[RateLimiter] = None, block_on_limit: bool = False):
+        """
+        :param api_key: 官网注册的API Key
+        :param rate_limiter: 请求限流器，默认每分钟10次
+        :param block_on_limit: 超出限流时阻塞等待；默认抛出QOSLimitError（在事件循环中调用时不应阻塞）
+        """
         self.base_url = BASE_URL
         self.api_key = api_key
+        self.rate_limiter = rate_limiter or RateLimiter(10, 60)
+        self.block_on_limit = block_on_limit
         self.session = requests.Session()
         self.session.headers.update({"Content-Type": "application/json"})
 
     def _request(self, endpoint: str, data: dict = None) -> dict:
         params = {"key": self.api_key}
+        if self.block_on_limit:
+            self.rate_limiter.acquire()
+        elif not self.rate_limiter.try_acquire():
+            raise QOSLimitError(
+                f"HTTP rate limit exceeded: max {self.rate_limiter.rate} requests per {self.rate_limiter.per}s"
+            )
         try:
             response = self.session.post(
                 f"{self.base_url}{endpoint}",
@@ -57,36 +71,39 @@ class QOSHttpClient:
     def get_kline(self, codes: List[str], ktype: int, count: int, adjust: int = 0) -> List[KLine]:
         """4.6 获取K线数据"""
         endpoint = "/kline"
-        data = {
-            "kline_reqs": [{
-                "c": code,
-                "kt": ktype,
-                "co": count,
-                "a": adjust
-            }
-            for code in codes
-            ]
+        kline_reqs = [{
+            "c": code,
+            "kt": ktype,
+            "co": count,
+            "a": adjust
         }
-        results = []
-        for item in self._request(endpoint, data):
-            results.extend([KLine(**k) for k in item["k"]])
-        return results
+        for code in codes
+        ]
+        return self._kline_request(endpoint, kline_reqs)
 
     def get_history_kline(self, codes: List[str], ktype: int, end_time: int, count: int, adjust: int = 0) -> List[KLine]:
         """4.7 获取历史K线"""
         endpoint = "/history"
-        data = {
-            "kline_reqs": [{
-                "c": code,
-                "kt": ktype,
-                "e": end_time,
-                "co": count,
-                "a": adjust
-            }
-            for code in codes
-            ]
+        kline_reqs = [{
+            "c": code,
+            "kt": ktype,
+            "e": end_time,
+            "co": count,
+            "a": adjust
         }
+        for code in codes
+        ]
+        return self._kline_request(endpoint, kline_reqs)
+
+    def get_kline_batch(self, kline_reqs: List[Dict[str, Any]]) -> List[KLine]:
+        """4.6 获取K线数据，每个品种可单独指定类型、数量和复权方式
+
+        :param kline_reqs: 请求列表，每项包含 c（代码）、kt（K线类型）、co（数量）、a（复权类型）
+        """
+        return self._kline_request("/kline", kline_reqs)
+
+    def _kline_request(self, endpoint: str, kline_reqs: List[Dict[str, Any]]) -> List[KLine]:
         results = []
-        for item in self._request(endpoint, data):
+        for item in self._request(endpoint, {"kline_reqs": kline_reqs}):
             results.extend([KLine(**k) for k in item["k"]])
         return results
\ No newline at end of file
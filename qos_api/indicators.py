@@ -0,0 +1,279 @@
+import math
+import numpy as np
+from typing import Dict, List, Optional
+from .models import QuoteSnapshot, TradeTick, KLine, IndicatorValues
+from .constants import WSType, TradeDirection
+from .utils import current_timestamp, grow_array
+
+class IndicatorEngine:
+    """流式指标引擎
+
+    按品种增量维护VWAP、EMA、滚动最高/最低价、已实现波动率和主动买卖量不平衡，
+    每个事件的更新代价为O(1)（最高/最低价为均摊O(1)）。所有品种的窗口状态保存在二维环形数组中（每行一个品种），
+    滚动最高/最低价使用同样按行存放的数组单调队列。
+
+    同一个引擎只应接入一种数据源（逐笔、快照或K线），否则窗口内的样本含义会混杂。
+    K线在同一根bar的推送会反复修订，因此只有在收到更新的bar（或调用flush）时才会计入窗口。
+    """
+
+    def __init__(self, window: int = 20, ema_span: int = 20, ktype: Optional[int] = None, capacity: int = 64):
+        """
+        :param window: 滚动窗口长度（样本数）
+        :param ema_span: EMA周期
+        :param ktype: 只处理该类型的K线，None表示不过滤
+        :param capacity: 初始品种容量，不足时自动扩容
+        """
+        if window < 1:
+            raise ValueError("window must be positive")
+        self.window = window
+        self.ktype = ktype
+        self._alpha = 2.0 / (ema_span + 1)
+        self._index: Dict[str, int] = {}
+        self._codes: List[str] = []
+
+        capacity = max(capacity, 1)
+        # 环形窗口：价格*成交量、成交量、对数收益平方、带方向成交量
+        self._pv = np.zeros((capacity, window))
+        self._vol = np.zeros((capacity, window))
+        self._r2 = np.zeros((capacity, window))
+        self._flow = np.zeros((capacity, window))
+        # 窗口累计值
+        self._sum_pv = np.zeros(capacity)
+        self._sum_v = np.zeros(capacity)
+        self._sum_r2 = np.zeros(capacity)
+        self._sum_flow = np.zeros(capacity)
+        self._ema = np.full(capacity, np.nan)
+        self._last = np.full(capacity, np.nan)
+        self._cum_vol = np.full(capacity, np.nan)  # 快照累计成交量
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._pos = np.zeros(capacity, dtype=np.int64)
+        # 单调队列（环形数组）：队首为窗口最值；最低价取负后按最高价维护
+        self._hi_val = np.zeros((capacity, window))
+        self._hi_seq = np.zeros((capacity, window), dtype=np.int64)
+        self._hi_head = np.zeros(capacity, dtype=np.int64)
+        self._hi_len = np.zeros(capacity, dtype=np.int64)
+        self._lo_val = np.zeros((capacity, window))
+        self._lo_seq = np.zeros((capacity, window), dtype=np.int64)
+        self._lo_head = np.zeros(capacity, dtype=np.int64)
+        self._lo_len = np.zeros(capacity, dtype=np.int64)
+        self._pending: Dict[int, KLine] = {}  # 尚未收盘的K线
+
+    @property
+    def codes(self) -> List[str]:
+        """已跟踪的品种代码，顺序与values()中的数组一致"""
+        return list(self._codes)
+
+    def _row(self, code: str) -> int:
+        row = self._index.get(code)
+        if row is not None:
+            return row
+        row = len(self._codes)
+        if row == self._sum_v.shape[0]:
+            self._grow(row * 2)
+        self._index[code] = row
+        self._codes.append(code)
+        return row
+
+    def _grow(self, capacity: int):
+        for name in ("_pv", "_vol", "_r2", "_flow", "_sum_pv", "_sum_v", "_sum_r2",
+                     "_sum_flow", "_count", "_pos", "_hi_val", "_hi_seq", "_hi_head",
+                     "_hi_len", "_lo_val", "_lo_seq", "_lo_head", "_lo_len"):
+            setattr(self, name, grow_array(getattr(self, name), capacity))
+        for name in ("_ema", "_last", "_cum_vol"):
+            setattr(self, name, grow_array(getattr(self, name), capacity, np.nan))
+
+    def _push_max(self, row: int, seq: int, value: float, vals: np.ndarray, seqs: np.ndarray,
+                  heads: np.ndarray, lens: np.ndarray):
+        """向单调递减队列写入样本，并移出窗口外的队首"""
+        window = self.window
+        head = int(heads[row])
+        size = int(lens[row])
+        while size and seqs[row, head] <= seq - window:
+            head = (head + 1) % window
+            size -= 1
+        while size and vals[row, (head + size - 1) % window] <= value:
+            size -= 1
+        tail = (head + size) % window
+        vals[row, tail] = value
+        seqs[row, tail] = seq
+        heads[row] = head
+        lens[row] = size + 1
+
+    def _push(self, row: int, price: float, volume: float, vwap_price: float,
+              high: float, low: float, flow: float):
+        """写入一个样本并增量更新窗口统计"""
+        pos = self._pos[row]
+        last = self._last[row]
+        r2 = math.log(price / last) ** 2 if last > 0 and price > 0 else 0.0
+        pv = vwap_price * volume
+
+        self._sum_pv[row] += pv - self._pv[row, pos]
+        self._sum_v[row] += volume - self._vol[row, pos]
+        self._sum_r2[row] += r2 - self._r2[row, pos]
+        self._sum_flow[row] += flow - self._flow[row, pos]
+        self._pv[row, pos] = pv
+        self._vol[row, pos] = volume
+        self._r2[row, pos] = r2
+        self._flow[row, pos] = flow
+
+        if self._count[row] == 0:
+            self._ema[row] = price
+        else:
+            self._ema[row] += self._alpha * (price - self._ema[row])
+
+        seq = int(self._count[row])
+        self._push_max(row, seq, high, self._hi_val, self._hi_seq, self._hi_head, self._hi_len)
+        self._push_max(row, seq, -low, self._lo_val, self._lo_seq, self._lo_head, self._lo_len)
+
+        self._count[row] += 1
+        self._last[row] = price
+        pos += 1
+        if pos == self.window:
+            pos = 0
+            # 每绕行一圈重新求和一次，消除浮点累计误差（均摊O(1)）
+            self._sum_pv[row] = self._pv[row].sum()
+            self._sum_v[row] = self._vol[row].sum()
+            self._sum_r2[row] = self._r2[row].sum()
+            self._sum_flow[row] = self._flow[row].sum()
+        self._pos[row] = pos
+
+    def on_trade(self, tick: TradeTick):
+        """处理逐笔成交"""
+        row = self._row(tick.c)
+        price = float(tick.p)
+        volume = float(tick.v)
+        if tick.d == TradeDirection.BUY.value:
+            flow = volume
+        elif tick.d == TradeDirection.SELL.value:
+            flow = -volume
+        else:
+            flow = 0.0
+        self._push(row, price, volume, price, price, price, flow)
+
+    def on_snapshot(self, snapshot: QuoteSnapshot):
+        """处理行情快照，成交量取相邻快照累计成交量之差，方向按价格变动推断"""
+        row = self._row(snapshot.c)
+        price = float(snapshot.lp)
+        cum = float(snapshot.v)
+        prev = self._cum_vol[row]
+        if np.isnan(prev):
+            volume = 0.0
+        elif cum >= prev:
+            volume = cum - prev
+        else:
+            volume = cum  # 累计成交量已按交易日重置
+        self._cum_vol[row] = cum
+        last = self._last[row]
+        flow = volume if price > last else -volume if price < last else 0.0
+        self._push(row, price, volume, price, price, price, flow)
+
+    def on_kline(self, kline: KLine):
+        """处理K线，同一根bar的重复推送只保留最新一次，收到下一根bar时计入窗口"""
+        if self.ktype is not None and kline.kt != self.ktype:
+            return
+        row = self._row(kline.c)
+        pending = self._pending.get(row)
+        if pending is not None:
+            if kline.ts < pending.ts:
+                return
+            if kline.ts > pending.ts:
+                self._commit(row, pending)
+        self._pending[row] = kline
+
+    def _commit(self, row: int, kline: KLine):
+        close = float(kline.cl)
+        open_ = float(kline.o)
+        high = float(kline.h)
+        low = float(kline.l)
+        volume = float(kline.v)
+        flow = volume if close > open_ else -volume if close < open_ else 0.0
+        self._push(row, close, volume, (high + low + close) / 3, high, low, flow)
+
+    def flush(self, code: Optional[str] = None):
+        """将未收盘的K线计入窗口"""
+        rows = list(self._pending) if code is None else [self._index[code]] if code in self._index else []
+        for row in rows:
+            kline = self._pending.pop(row, None)
+            if kline is not None:
+                self._commit(row, kline)
+
+    def seed(self, client, codes: List[str], count: Optional[int] = None, end_time: Optional[int] = None) -> int:
+        """用历史K线预热指标
+
+        :param client: QOSClient或QOSHttpClient
+        :param codes: 品种代码列表
+        :param count: 每个品种拉取的K线数量，默认window+1
+        :param end_time: 结束时间戳，默认当前时间
+        :return: 处理的K线数量
+        """
+        if self.ktype is None:
+            raise ValueError("ktype is required to seed from history kline")
+        klines = client.get_history_kline(
+            codes,
+            self.ktype,
+            end_time if end_time is not None else current_timestamp(),
+            count if count is not None else self.window + 1
+        )
+        klines.sort(key=lambda k: (k.c, k.ts))
+        for kline in klines:
+            self.on_kline(kline)
+        return len(klines)
+
+    def attach(self, client, data_type: str = WSType.TRADE.value):
+        """注册到WebSocket数据推送
+
+        :param client: QOSClient或QOSWebSocketClient
+        :param data_type: 数据类型，"T"逐笔、"S"快照或"K"K线
+        """
+        handlers = {
+            WSType.TRADE.value: self.on_trade,
+            WSType.SNAPSHOT.value: self.on_snapshot,
+            WSType.KLINE.value: self.on_kline
+        }
+        if data_type not in handlers:
+            raise ValueError(f"Unsupported data type: {data_type}")
+        handler = handlers[data_type]
+
+        async def callback(data):
+            handler(data)
+
+        client.register_callback(data_type, callback)
+
+    def get(self, code: str) -> Optional[IndicatorValues]:
+        """获取单个品种的指标值"""
+        row = self._index.get(code)
+        if row is None:
+            return None
+        n = int(min(self._count[row], self.window))
+        if n == 0:
+            return IndicatorValues(c=code, n=0)
+        sum_v = self._sum_v[row]
+        return IndicatorValues(
+            c=code,
+            n=n,
+            last=float(self._last[row]),
+            vwap=float(self._sum_pv[row] / sum_v) if sum_v > 0 else None,
+            ema=float(self._ema[row]),
+            high=float(self._hi_val[row, self._hi_head[row]]),
+            low=float(-self._lo_val[row, self._lo_head[row]]),
+            volatility=math.sqrt(max(self._sum_r2[row], 0.0)),
+            imbalance=float(self._sum_flow[row] / sum_v) if sum_v > 0 else None
+        )
+
+    def values(self) -> Dict[str, np.ndarray]:
+        """获取所有品种的指标数组，行顺序与codes一致，缺失值为NaN"""
+        n = len(self._codes)
+        rows = np.arange(n)
+        sum_v = self._sum_v[:n]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vwap = np.where(sum_v > 0, self._sum_pv[:n] / sum_v, np.nan)
+            imbalance = np.where(sum_v > 0, self._sum_flow[:n] / sum_v, np.nan)
+        return {
+            "last": self._last[:n].copy(),
+            "vwap": vwap,
+            "ema": self._ema[:n].copy(),
+            "high": np.where(self._hi_len[:n] > 0, self._hi_val[rows, self._hi_head[:n]], np.nan),
+            "low": np.where(self._lo_len[:n] > 0, -self._lo_val[rows, self._lo_head[:n]], np.nan),
+            "volatility": np.sqrt(np.maximum(self._sum_r2[:n], 0.0)),
+            "imbalance": imbalance
+        }
@@ -0,0 +1,104 @@
+from typing import Dict, List, Optional, Tuple
+from .models import KLine
+from .constants import KLINE_PERIOD_SECONDS
+from .utils import current_timestamp
+
+class KLineCache:
+    """K线增量缓存
+
+    按 (代码, K线类型, 复权类型) 缓存K线。刷新时根据缓存中最后一根K线的时间戳
+    估算需要的最少数量（包含可能被修订的最后一根），并把所有需要刷新的品种
+    合并到一次 kline_reqs 请求中。
+    """
+
+    def __init__(self, client, max_bars: int = 1000, min_interval: float = 0):
+        """
+        :param client: QOSClient或QOSHttpClient
+        :param max_bars: 每个品种最多缓存的K线数量
+        :param min_interval: 距上次刷新不足该秒数的品种本次跳过
+        """
+        self._client = client
+        self.max_bars = max_bars
+        self.min_interval = min_interval
+        self._bars: Dict[Tuple[str, int, int], List[KLine]] = {}
+        self._fetched_at: Dict[Tuple[str, int, int], int] = {}
+
+    def get(self, code: str, ktype: int, adjust: int = 0) -> List[KLine]:
+        """获取缓存的K线（按时间升序）"""
+        return list(self._bars.get((code, ktype, adjust), []))
+
+    def last_ts(self, code: str, ktype: int, adjust: int = 0) -> Optional[int]:
+        """缓存中最后一根K线的时间戳"""
+        bars = self._bars.get((code, ktype, adjust))
+        return bars[-1].ts if bars else None
+
+    def clear(self, code: Optional[str] = None):
+        """清空缓存，指定code时只清空该品种"""
+        if code is None:
+            self._bars.clear()
+            self._fetched_at.clear()
+            return
+        for key in [key for key in self._bars if key[0] == code]:
+            del self._bars[key]
+            self._fetched_at.pop(key, None)
+
+    def _missing_count(self, key: Tuple[str, int, int], count: int, now: int) -> int:
+        """估算需要请求的K线数量，至少重新拉取最后一根以获取其修订"""
+        bars = self._bars.get(key)
+        period = KLINE_PERIOD_SECONDS.get(key[1])
+        if not bars or period is None or len(bars) < min(count, self.max_bars):
+            return count
+        elapsed = max(now - bars[-1].ts, 0)
+        return max(1, min(count, elapsed // period + 1))
+
+    def _merge(self, key: Tuple[str, int, int], klines: List[KLine]):
+        klines.sort(key=lambda k: k.ts)
+        bars = self._bars.get(key, [])
+        first_ts = klines[0].ts
+        # 增量请求总会包含缓存的最后一根K线；新数据与缓存不重叠说明请求数量被count截断，
+        # 中间缺失的K线无法补齐，直接以新数据替换缓存，避免序列中出现空洞
+        if bars and first_ts > bars[-1].ts:
+            bars = []
+        # 丢弃与新数据重叠的旧K线，由新数据覆盖
+        keep = len(bars)
+        while keep and bars[keep - 1].ts >= first_ts:
+            keep -= 1
+        bars = bars[:keep] + klines
+        self._bars[key] = bars[-self.max_bars:]
+
+    def refresh(self, codes: List[str], ktype: int, count: int, adjust: int = 0,
+                now: Optional[int] = None) -> Dict[str, List[KLine]]:
+        """增量刷新K线，所有需要刷新的品种只发起一次HTTP请求
+
+        :param codes: 品种代码列表
+        :param ktype: K线类型
+        :param count: 每个品种需要的K线数量
+        :param adjust: 复权类型 (0: 不复权, 1: 前复权)
+        :param now: 当前时间戳，默认系统时间
+        :return: 每个品种最近count根K线
+        """
+        now = now if now is not None else current_timestamp()
+        kline_reqs = []
+        for code in codes:
+            key = (code, ktype, adjust)
+            fetched_at = self._fetched_at.get(key)
+            if fetched_at is not None and now - fetched_at < self.min_interval:
+                continue
+            kline_reqs.append({
+                "c": code,
+                "kt": ktype,
+                "co": self._missing_count(key, count, now),
+                "a": adjust
+            })
+
+        if kline_reqs:
+            grouped: Dict[str, List[KLine]] = {}
+            for kline in self._client.get_kline_batch(kline_reqs):
+                grouped.setdefault(kline.c, []).append(kline)
+            for req in kline_reqs:
+                key = (req["c"], ktype, adjust)
+                self._fetched_at[key] = now
+                if grouped.get(req["c"]):
+                    self._merge(key, grouped[req["c"]])
+
+        return {code: self.get(code, ktype, adjust)[-count:] for code in codes}
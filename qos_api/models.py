@@ -89,4 +89,15 @@ class WSResponse(BaseResponse):
     type: str
     reqid: Optional[int] = None
     time: Optional[int] = None
-    data: Optional[List[Dict]] = None
\ No newline at end of file
+    data: Optional[List[Dict]] = None
+
+class IndicatorValues(BaseModel):
+    c: str                              # 股票代码
+    n: int                              # 窗口内样本数
+    last: Optional[float] = None        # 最新价
+    vwap: Optional[float] = None        # 成交量加权均价
+    ema: Optional[float] = None         # 指数移动平均
+    high: Optional[float] = None        # 窗口最高价
+    low: Optional[float] = None         # 窗口最低价
+    volatility: Optional[float] = None  # 窗口已实现波动率（对数收益）
+    imbalance: Optional[float] = None   # 主动买卖量不平衡 [-1, 1]
@@ -0,0 +1,150 @@
+import asyncio
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+from .models import QuoteSnapshot, MarketDepth, KLine
+
+class TransportRouter:
+    """HTTP/WebSocket双通道请求路由
+
+    按各通道的延迟EWMA选择较快的通道发起请求；若在自适应延迟内未返回，
+    则在另一通道发起对冲请求，取先返回的结果并取消另一个。
+    限流由通道客户端自身负责（HTTP令牌桶、WebSocket发送间隔），路由只在选择通道和
+    决定是否对冲时查看其余量：当前无法立即发送的通道不会被用于对冲。
+
+    HTTP请求在线程池中执行，取消只会丢弃其结果，不会中断已发出的请求。
+    """
+
+    HTTP = "http"
+    WS = "ws"
+
+    def __init__(
+        self,
+        http,
+        ws,
+        hedge: bool = True,
+        alpha: float = 0.2,
+        hedge_multiplier: float = 4.0,
+        min_hedge_delay: float = 0.05,
+        initial_hedge_delay: float = 0.5
+    ):
+        """
+        :param http: QOSHttpClient
+        :param ws: QOSWebSocketClient
+        :param hedge: 是否启用对冲请求
+        :param alpha: 延迟EWMA的平滑系数
+        :param hedge_multiplier: 对冲延迟 = 延迟均值 + hedge_multiplier * 延迟偏差
+        :param min_hedge_delay: 对冲延迟下限（秒）
+        :param initial_hedge_delay: 尚无延迟样本时的对冲延迟（秒）
+        """
+        self._clients = {self.HTTP: http, self.WS: ws}
+        self.hedge = hedge
+        self.alpha = alpha
+        self.hedge_multiplier = hedge_multiplier
+        self.min_hedge_delay = min_hedge_delay
+        self.initial_hedge_delay = initial_hedge_delay
+        self._ewma: Dict[str, Optional[float]] = {self.HTTP: None, self.WS: None}
+        self._dev: Dict[str, float] = {self.HTTP: 0.0, self.WS: 0.0}
+
+    def latency(self, transport: str) -> Optional[float]:
+        """通道的延迟EWMA（秒），尚无样本时为None"""
+        return self._ewma[transport]
+
+    def hedge_delay(self, transport: str) -> float:
+        """在该通道发起请求后，等待多久再发起对冲请求（秒）"""
+        ewma = self._ewma[transport]
+        if ewma is None:
+            return self.initial_hedge_delay
+        return max(self.min_hedge_delay, ewma + self.hedge_multiplier * self._dev[transport])
+
+    def _record(self, transport: str, elapsed: float):
+        ewma = self._ewma[transport]
+        if ewma is None:
+            self._ewma[transport] = elapsed
+            self._dev[transport] = elapsed / 2
+            return
+        self._dev[transport] += self.alpha * (abs(elapsed - ewma) - self._dev[transport])
+        self._ewma[transport] = ewma + self.alpha * (elapsed - ewma)
+
+    def _can_send(self, transport: str) -> bool:
+        """通道当前是否有发送余量"""
+        client = self._clients[transport]
+        if transport == self.HTTP:
+            return client.rate_limiter.available()
+        return client.can_send()
+
+    def _order(self) -> Tuple[str, str]:
+        """(首选通道, 备用通道)，没有样本的通道优先以便获得测量"""
+        http = self._ewma[self.HTTP]
+        ws = self._ewma[self.WS]
+        if ws is None or (http is not None and ws <= http):
+            return self.WS, self.HTTP
+        return self.HTTP, self.WS
+
+    async def _timed(self, transport: str, method: str, args: tuple):
+        start = time.monotonic()
+        try:
+            client = self._clients[transport]
+            if transport == self.HTTP:
+                loop = asyncio.get_event_loop()
+                result = await loop.run_in_executor(None, partial(getattr(client, method), *args))
+            else:
+                result = await getattr(client, method)(*args)
+        except asyncio.CancelledError:
+            # 被取消时的耗时只是真实延迟的下界：尚无样本时作为首个样本，之后只能调高EWMA，不能调低
+            elapsed = time.monotonic() - start
+            ewma = self._ewma[transport]
+            if ewma is None or elapsed > ewma:
+                self._record(transport, elapsed)
+            raise
+        except Exception:
+            self._record(transport, max(time.monotonic() - start, self.hedge_delay(transport)))
+            raise
+        self._record(transport, time.monotonic() - start)
+        return result
+
+    async def _execute(self, methods: Dict[str, str], args: tuple) -> Any:
+        primary, secondary = self._order()
+        if not self._can_send(primary) and self._can_send(secondary):
+            primary, secondary = secondary, primary
+
+        tasks = {asyncio.ensure_future(self._timed(primary, methods[primary], args)): primary}
+        secondary_started = False
+        last_error: Optional[BaseException] = None
+        try:
+            if self.hedge:
+                done, _ = await asyncio.wait(list(tasks), timeout=self.hedge_delay(primary))
+                if not done and self._can_send(secondary):
+                    tasks[asyncio.ensure_future(self._timed(secondary, methods[secondary], args))] = secondary
+                    secondary_started = True
+
+            while tasks:
+                done, _ = await asyncio.wait(list(tasks), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                # 首选通道失败且尚未对冲时改用备用通道（不是重复请求，由其客户端自行限流）
+                if not tasks and not secondary_started:
+                    tasks[asyncio.ensure_future(self._timed(secondary, methods[secondary], args))] = secondary
+                    secondary_started = True
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                # 等待被取消的请求完成收尾，使其延迟下界在下一次选路前已计入
+                await asyncio.gather(*tasks, return_exceptions=True)
+        raise last_error
+
+    async def snapshot(self, codes: List[str]) -> List[QuoteSnapshot]:
+        """获取行情快照"""
+        return await self._execute({self.HTTP: "get_snapshot", self.WS: "request_snapshot"}, (codes,))
+
+    async def depth(self, codes: List[str]) -> List[MarketDepth]:
+        """获取盘口深度"""
+        return await self._execute({self.HTTP: "get_depth", self.WS: "request_depth"}, (codes,))
+
+    async def kline(self, codes: List[str], ktype: int, count: int) -> List[KLine]:
+        """获取K线数据（不复权）"""
+        return await self._execute({self.HTTP: "get_kline", self.WS: "request_kline"}, (codes, ktype, count))
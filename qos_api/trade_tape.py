@@ -0,0 +1,181 @@
+import numpy as np
+from typing import Dict, List, Optional
+from .models import TradeTick
+from .constants import WSType, TradeDirection
+from .utils import current_timestamp, grow_array
+
+class _TapeBuffer:
+    """单个品种的定长环形缓冲
+
+    写满之前数据按顺序存放在 [0, size)，数组按需倍增，最多到 capacity。
+    写满后扩展为 2 * capacity，每个元素同时写入 i 和 i + capacity 两个位置，
+    使得按时间排序的有效区间 [start, start + size) 始终连续，可以直接返回零拷贝视图。
+    """
+
+    __slots__ = ("capacity", "start", "size", "ts", "price", "volume", "direction")
+
+    INITIAL_SIZE = 64
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.start = 0
+        self.size = 0
+        n = min(capacity, self.INITIAL_SIZE)
+        self.ts = np.zeros(n, dtype=np.int64)
+        self.price = np.zeros(n)
+        self.volume = np.zeros(n)
+        self.direction = np.zeros(n, dtype=np.int8)
+
+    def _resize(self, n: int):
+        for name in ("ts", "price", "volume", "direction"):
+            setattr(self, name, grow_array(getattr(self, name), n))
+
+    def append(self, ts: int, price: float, volume: float, direction: int):
+        if self.size < self.capacity:
+            if self.size == self.ts.shape[0]:
+                self._resize(min(2 * self.size, self.capacity))
+            slots = (self.size,)
+            self.size += 1
+        else:
+            if self.ts.shape[0] < 2 * self.capacity:
+                # 首次回绕：扩展为双倍长度并建立镜像
+                self._resize(2 * self.capacity)
+                for arr in (self.ts, self.price, self.volume, self.direction):
+                    arr[self.capacity:] = arr[:self.capacity]
+            slots = (self.start, self.start + self.capacity)
+            self.start = (self.start + 1) % self.capacity
+        for arr, value in ((self.ts, ts), (self.price, price), (self.volume, volume), (self.direction, direction)):
+            for i in slots:
+                arr[i] = value
+
+    def last_ts(self) -> Optional[int]:
+        return int(self.ts[self.start + self.size - 1]) if self.size else None
+
+    def view(self, lo: int = 0, hi: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """有效区间内[lo, hi)的只读视图"""
+        hi = self.size if hi is None else hi
+        begin = self.start + lo
+        end = self.start + hi
+        views = {
+            "ts": self.ts[begin:end],
+            "price": self.price[begin:end],
+            "volume": self.volume[begin:end],
+            "direction": self.direction[begin:end]
+        }
+        for arr in views.values():
+            arr.flags.writeable = False
+        return views
+
+_EMPTY = _TapeBuffer(1)
+
+class TradeTape:
+    """逐笔成交带
+
+    为每个品种维护定长的逐笔成交环形缓冲（NumPy数组），内存占用与运行时长无关。
+    缓冲按需增长：成交较少的品种只占用少量内存；写满capacity后每个品种约占
+    2 * capacity * 25 字节（默认4096笔约200KB），订阅大量活跃品种时请相应调小capacity。
+    可由逐笔订阅推送持续写入，并用 get_trades 预热；按时间窗口查询为O(log n)。
+
+    trades()/window() 返回的是环形缓冲上的零拷贝视图，只在该品种下一次写入之前有效：
+    缓冲写满后，后续写入会覆盖视图引用的位置，视图内容将不再按时间排序。
+    需要跨写入保留数据时请对视图调用 .copy()。
+    """
+
+    def __init__(self, capacity: int = 4096):
+        """
+        :param capacity: 每个品种保留的最大成交笔数
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.dropped = 0  # 因时间戳倒序被丢弃的成交笔数
+        self._buffers: Dict[str, _TapeBuffer] = {}
+
+    @property
+    def codes(self) -> List[str]:
+        """已有成交数据的品种代码"""
+        return list(self._buffers)
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def size(self, code: str) -> int:
+        """品种当前缓存的成交笔数"""
+        buf = self._buffers.get(code)
+        return buf.size if buf else 0
+
+    def append(self, tick: TradeTick) -> bool:
+        """写入一笔成交，时间戳早于已有最新成交时丢弃并返回False"""
+        buf = self._buffers.get(tick.c)
+        if buf is None:
+            buf = self._buffers[tick.c] = _TapeBuffer(self.capacity)
+        last = buf.last_ts()
+        if last is not None and tick.ts < last:
+            self.dropped += 1
+            return False
+        buf.append(tick.ts, float(tick.p), float(tick.v), tick.d)
+        return True
+
+    def seed(self, client, codes: List[str], count: int = 50) -> int:
+        """用最近的逐笔成交预热，应在订阅逐笔推送之前调用
+
+        :param client: QOSClient或QOSHttpClient
+        :param codes: 品种代码列表
+        :param count: 每个品种拉取的成交笔数（接口上限50）
+        :return: 写入的成交笔数
+        """
+        ticks = client.get_trades(codes, count)
+        ticks.sort(key=lambda t: (t.c, t.ts))
+        return sum(self.append(tick) for tick in ticks)
+
+    def attach(self, client):
+        """注册到WebSocket逐笔成交推送
+
+        :param client: QOSClient或QOSWebSocketClient
+        """
+        async def callback(tick: TradeTick):
+            self.append(tick)
+
+        client.register_callback(WSType.TRADE.value, callback)
+
+    def trades(self, code: str) -> Dict[str, np.ndarray]:
+        """品种全部缓存成交的零拷贝只读视图，按时间升序，仅在下一次写入前有效
+
+        :return: 包含 ts、price、volume、direction 四个数组的字典
+        """
+        buf = self._buffers.get(code)
+        if buf is None:
+            return _EMPTY.view()
+        return buf.view()
+
+    def window(self, code: str, seconds: float, now: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """最近seconds秒内（[now - seconds, now]）成交的零拷贝只读视图，仅在下一次写入前有效
+
+        :param now: 窗口结束时间戳，默认当前时间
+        """
+        buf = self._buffers.get(code)
+        if buf is None:
+            return _EMPTY.view()
+        now = now if now is not None else current_timestamp()
+        ts = buf.ts[buf.start:buf.start + buf.size]
+        lo = int(np.searchsorted(ts, now - seconds, side="left"))
+        hi = int(np.searchsorted(ts, now, side="right"))
+        return buf.view(lo, max(lo, hi))
+
+    def volume_by_direction(self, code: str, seconds: Optional[float] = None,
+                            now: Optional[int] = None) -> Dict[TradeDirection, float]:
+        """按成交方向汇总成交量
+
+        :param seconds: 统计最近seconds秒，None表示全部缓存成交
+        :param now: 窗口结束时间戳，默认当前时间
+        """
+        data = self.trades(code) if seconds is None else self.window(code, seconds, now)
+        sums = np.bincount(data["direction"], weights=data["volume"], minlength=len(TradeDirection))
+        return {direction: float(sums[direction.value]) for direction in TradeDirection}
+
+    def clear(self, code: Optional[str] = None):
+        """清空缓存，指定code时只清空该品种"""
+        if code is None:
+            self._buffers.clear()
+        else:
+            self._buffers.pop(code, None)
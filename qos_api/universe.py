@@ -0,0 +1,174 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+from .models import QuoteSnapshot
+from .constants import WSType
+from .utils import grow_array
+
+class UniverseMatrix:
+    """全市场快照矩阵
+
+    将品种代码映射为整数id，按列保存最新快照（NumPy数组，原地更新），
+    便于对全市场做向量化的涨跌幅排序、过滤和Top-N查询。
+    """
+
+    FLOAT_COLUMNS = ("last", "prev_close", "open", "high", "low", "volume", "turnover")
+    INT_COLUMNS = ("ts", "s", "tt")
+
+    def __init__(self, capacity: int = 1024):
+        """
+        :param capacity: 初始品种容量，不足时自动扩容
+        """
+        capacity = max(capacity, 1)
+        self._index: Dict[str, int] = {}
+        self._codes: List[str] = []
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.full(capacity, np.nan) for name in self.FLOAT_COLUMNS
+        }
+        self._columns["ts"] = np.zeros(capacity, dtype=np.int64)
+        self._columns["s"] = np.zeros(capacity, dtype=np.int8)
+        self._columns["tt"] = np.full(capacity, -1, dtype=np.int8)  # -1表示无交易时段信息
+        self._dirty = np.zeros(capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._index
+
+    @property
+    def codes(self) -> List[str]:
+        """按id顺序排列的品种代码"""
+        return list(self._codes)
+
+    def intern(self, code: str) -> int:
+        """获取品种id，不存在时分配新id"""
+        cid = self._index.get(code)
+        if cid is not None:
+            return cid
+        cid = len(self._codes)
+        if cid == self._dirty.shape[0]:
+            self._grow(cid * 2)
+        self._index[code] = cid
+        self._codes.append(code)
+        return cid
+
+    def code_id(self, code: str) -> Optional[int]:
+        """获取品种id，不存在时返回None"""
+        return self._index.get(code)
+
+    def _grow(self, capacity: int):
+        for name, arr in self._columns.items():
+            if name in self.FLOAT_COLUMNS:
+                fill = np.nan
+            elif name == "tt":
+                fill = -1
+            else:
+                fill = 0
+            self._columns[name] = grow_array(arr, capacity, fill)
+        self._dirty = grow_array(self._dirty, capacity, False)
+
+    def update(self, snapshot: QuoteSnapshot):
+        """用单条快照原地更新对应行，早于已有数据的快照（如滞后的HTTP结果）被忽略"""
+        cid = self.intern(snapshot.c)
+        cols = self._columns
+        if snapshot.ts < cols["ts"][cid]:
+            return
+        cols["last"][cid] = float(snapshot.lp)
+        if snapshot.yp:
+            cols["prev_close"][cid] = float(snapshot.yp)  # 推送未带昨收时保留原值
+        cols["open"][cid] = float(snapshot.o)
+        cols["high"][cid] = float(snapshot.h)
+        cols["low"][cid] = float(snapshot.l)
+        cols["volume"][cid] = float(snapshot.v)
+        cols["turnover"][cid] = float(snapshot.t)
+        cols["ts"][cid] = snapshot.ts
+        cols["s"][cid] = snapshot.s
+        cols["tt"][cid] = snapshot.tt if snapshot.tt is not None else -1
+        self._dirty[cid] = True
+
+    def update_many(self, snapshots: Iterable[QuoteSnapshot]):
+        """批量更新快照"""
+        for snapshot in snapshots:
+            self.update(snapshot)
+
+    def refresh(self, client, codes: List[str]) -> int:
+        """通过HTTP快照接口刷新指定品种
+
+        :param client: QOSClient或QOSHttpClient
+        :param codes: 品种代码列表
+        :return: 更新的快照数量
+        """
+        snapshots = client.get_snapshot(codes)
+        self.update_many(snapshots)
+        return len(snapshots)
+
+    def attach(self, client):
+        """注册到WebSocket快照推送
+
+        :param client: QOSClient或QOSWebSocketClient
+        """
+        async def callback(snapshot: QuoteSnapshot):
+            self.update(snapshot)
+
+        client.register_callback(WSType.SNAPSHOT.value, callback)
+
+    def column(self, name: str) -> np.ndarray:
+        """获取列的只读视图，长度等于品种数，按id索引
+
+        可用列：last, prev_close, open, high, low, volume, turnover, ts, s, tt
+        """
+        if name not in self._columns:
+            raise ValueError(f"Unknown column: {name}")
+        view = self._columns[name][:len(self._codes)]
+        view.flags.writeable = False
+        return view
+
+    def pct_change(self) -> np.ndarray:
+        """相对昨收的涨跌幅（百分比），无昨收时为NaN"""
+        last = self.column("last")
+        prev = self.column("prev_close")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(prev > 0, (last / prev - 1.0) * 100.0, np.nan)
+
+    def select(self, mask: np.ndarray) -> List[str]:
+        """返回布尔掩码选中的品种代码"""
+        return [self._codes[i] for i in np.flatnonzero(mask)]
+
+    def top_n(self, values: np.ndarray, n: int, ascending: bool = False,
+              mask: Optional[np.ndarray] = None) -> List[str]:
+        """按给定数值取前N个品种，NaN不参与排序
+
+        :param values: 按id索引的数值数组，例如column("turnover")或pct_change()
+        :param n: 数量
+        :param ascending: True取最小的N个
+        :param mask: 可选的布尔过滤掩码
+        """
+        valid = ~np.isnan(values)
+        if mask is not None:
+            valid &= mask
+        ids = np.flatnonzero(valid)
+        if n <= 0 or ids.size == 0:
+            return []
+        keys = values[ids] if ascending else -values[ids]
+        if n < ids.size:
+            part = np.argpartition(keys, n - 1)[:n]
+        else:
+            part = np.arange(ids.size)
+        order = part[np.argsort(keys[part], kind="stable")]
+        return [self._codes[i] for i in ids[order]]
+
+    def rank_pct_change(self, n: int, ascending: bool = False,
+                        mask: Optional[np.ndarray] = None) -> List[str]:
+        """涨幅榜（ascending=True为跌幅榜）前N个品种"""
+        return self.top_n(self.pct_change(), n, ascending, mask)
+
+    def dirty(self, clear: bool = True) -> np.ndarray:
+        """自上次读取以来被更新过的品种掩码
+
+        :param clear: 读取后是否清除标记
+        """
+        n = len(self._codes)
+        mask = self._dirty[:n].copy()
+        if clear:
+            self._dirty[:n] = False
+        return mask
@@ -1,4 +1,6 @@
+import threading
 import time
+import numpy as np
 from typing import Any, Dict, Optional
 from .exceptions import QOSAPIError
 
@@ -66,4 +68,60 @@ def build_kline_request(
     }
     if end_time is not None:
         req["e"] = end_time
-    return {"kline_reqs": [req]}
\ No newline at end of file
+    return {"kline_reqs": [req]}
+
+class RateLimiter:
+    """令牌桶限流器（线程安全），每per秒最多rate次"""
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+    def available(self) -> bool:
+        """当前是否有可用令牌（不消耗）"""
+        with self._lock:
+            self._refill()
+            return self._tokens >= 1
+
+    def _take(self) -> float:
+        """尝试获取一个令牌，成功返回0，否则返回距下一个令牌的等待秒数"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) * self.per / self.rate
+
+    def try_acquire(self) -> bool:
+        """尝试获取一个令牌，失败时立即返回False"""
+        return self._take() == 0.0
+
+    def acquire(self):
+        """获取一个令牌，必要时阻塞等待"""
+        wait = self._take()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self._take()
+
+def grow_array(arr: np.ndarray, capacity: int, fill: Any = 0) -> np.ndarray:
+    """沿第一维扩容数组，保留原有数据
+
+    Args:
+        arr: 原数组
+        capacity: 新的第一维长度
+        fill: 新增部分的填充值
+
+    Returns:
+        扩容后的新数组
+    """
+    out = np.full((capacity,) + arr.shape[1:], fill, dtype=arr.dtype)
+    out[:arr.shape[0]] = arr
+    return out
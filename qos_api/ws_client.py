@@ -1,16 +1,51 @@
 import asyncio
 import json
 import logging
+import time
 import websockets
-from typing import Callable, Awaitable, Optional, List, Dict, Any
+from websockets.extensions.permessage_deflate import ClientPerMessageDeflateFactory
+from typing import Callable, Awaitable, Optional, List, Dict, Any, Tuple
 from .models import *
 from .exceptions import QOSAPIError
 from .constants import WS_URL, WSType, MAX_SUB_CODES
 
+# 订阅类型对应的取消订阅类型
+_CANCEL_TYPES = {
+    WSType.SNAPSHOT.value: WSType.SNAPSHOT_CANCEL.value,
+    WSType.TRADE.value: WSType.TRADE_CANCEL.value,
+    WSType.DEPTH.value: WSType.DEPTH_CANCEL.value,
+    WSType.KLINE.value: WSType.KLINE_CANCEL.value
+}
+
 class QOSWebSocketClient:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        compression: Optional[str] = "deflate",
+        deflate_options: Optional[Dict[str, Any]] = None,
+        max_size: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        write_limit: Optional[int] = None,
+        min_send_interval: float = 1.0
+    ):
+        """
+        :param api_key: 官网注册的API Key
+        :param compression: 压缩协商，"deflate"启用permessage-deflate，None关闭
+        :param deflate_options: permessage-deflate参数（如client_max_window_bits、compress_settings），
+                                设置后替代默认的压缩协商
+        :param max_size: 单条消息最大字节数，None使用websockets默认值
+        :param max_queue: 接收队列最大消息数（websockets>=14也可传(high, low)水位），None使用websockets默认值
+        :param write_limit: 发送缓冲区高水位（字节）
+        :param min_send_interval: 发送消息的最小间隔（秒），间隔内的订阅变更会合并发送
+        """
         self.api_key = api_key
         self.ws_url = f"{WS_URL}?key={api_key}"
+        self.compression = compression
+        self.deflate_options = deflate_options
+        self.max_size = max_size
+        self.max_queue = max_queue
+        self.write_limit = write_limit
+        self.min_send_interval = min_send_interval
         self.websocket = None
         self._req_counter = 0
         self._callbacks = {
@@ -21,6 +56,14 @@ class QOSWebSocketClient:
         }
         self._pending_requests = {}
         self._running = False
+        self._send_lock: Optional[asyncio.Lock] = None
+        self._last_send = 0.0
+        # 待合并发送的订阅变更：(订阅类型, K线类型) -> {代码: 订阅/取消}
+        self._sub_pending: Dict[Tuple[str, Optional[int]], Dict[str, bool]] = {}
+        self._sub_waiters: List[Tuple[asyncio.Future, Tuple[str, Optional[int]], List[str]]] = []
+        # 已确认的订阅：(订阅类型, K线类型) -> 代码集合
+        self._subscribed: Dict[Tuple[str, Optional[int]], set] = {}
+        self._flush_task: Optional[asyncio.Task] = None
 
     async def connect(self):
         """建立WebSocket连接"""
@@ -29,12 +72,44 @@ class QOSWebSocketClient:
                 self.ws_url,
                 ping_interval=20,
                 ping_timeout=60,
-                close_timeout=1
+                close_timeout=1,
+                **self._connect_options()
             )
             self._running = True
             asyncio.create_task(self._listen_messages())
             asyncio.create_task(self._send_heartbeat_loop())  # 启动心跳协程
 
+    def _connect_options(self) -> Dict[str, Any]:
+        """压缩与缓冲区相关的连接参数，未设置的项使用websockets默认值"""
+        options: Dict[str, Any] = {}
+        if self.deflate_options is not None:
+            options["compression"] = None
+            options["extensions"] = [ClientPerMessageDeflateFactory(**self.deflate_options)]
+        else:
+            options["compression"] = self.compression
+        for name in ("max_size", "max_queue", "write_limit"):
+            value = getattr(self, name)
+            if value is not None:
+                options[name] = value
+        return options
+
+    async def _send(self, message: Dict):
+        """发送消息，保证相邻消息间隔不小于min_send_interval"""
+        if self._send_lock is None:
+            self._send_lock = asyncio.Lock()
+        async with self._send_lock:
+            wait = self._last_send + self.min_send_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self.websocket.send(json.dumps(message))
+            self._last_send = time.monotonic()
+
+    def can_send(self) -> bool:
+        """当前发送消息是否无需等待发送间隔"""
+        if self._send_lock is not None and self._send_lock.locked():
+            return False
+        return time.monotonic() - self._last_send >= self.min_send_interval
+
     async def _send_heartbeat_loop(self):
         """每隔20秒发送一次心跳"""
         while self._running and self.websocket:
@@ -47,6 +122,7 @@ class QOSWebSocketClient:
     async def disconnect(self):
         """断开连接"""
         self._running = False
+        self._subscribed.clear()  # 连接断开后服务端订阅失效
         if self.websocket:
             await self.websocket.close()
             self.websocket = None
@@ -65,8 +141,9 @@ class QOSWebSocketClient:
                 # 处理请求响应
                 reqid = data.get("reqid")
                 if reqid and reqid in self._pending_requests:
-                    self._pending_requests[reqid].set_result(data)
-                    del self._pending_requests[reqid]
+                    future = self._pending_requests.pop(reqid)
+                    if not future.done():
+                        future.set_result(data)
                     continue
                 
                 # 处理数据推送
@@ -115,84 +192,114 @@ class QOSWebSocketClient:
         future = loop.create_future()
         self._pending_requests[reqid] = future
         
-        await self.websocket.send(json.dumps(request))
-        
-        # 等待响应或超时
+        # 等待发送间隔、发送并等待响应或超时
         try:
+            await self._send(request)
             return await asyncio.wait_for(future, timeout=10)
         except asyncio.TimeoutError:
-            del self._pending_requests[reqid]
             raise QOSAPIError("Request timeout")
+        finally:
+            # 超时或被取消时移除等待中的请求
+            self._pending_requests.pop(reqid, None)
+
+    async def _queue_subscription(self, sub_type: str, codes: List[str], subscribe: bool, ktype: Optional[int] = None):
+        """登记订阅变更，等待其随下一批合并消息发送并得到响应"""
+        if subscribe and len(codes) > MAX_SUB_CODES:
+            raise QOSAPIError(f"Max subscription count is {MAX_SUB_CODES}")
+        if not self.websocket:
+            await self.connect()
+
+        key = (sub_type, ktype)
+        changes = self._sub_pending.setdefault(key, {})
+        for code in codes:
+            changes[code] = subscribe
+        future = asyncio.get_event_loop().create_future()
+        self._sub_waiters.append((future, key, codes))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_subscriptions())
+        await future
+
+    async def _flush_subscriptions(self):
+        """按类型合并发送间隔窗口内累积的订阅变更"""
+        while self._sub_pending:
+            wait = self._last_send + self.min_send_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            pending, self._sub_pending = self._sub_pending, {}
+            waiters, self._sub_waiters = self._sub_waiters, []
+
+            # 发送失败的代码：(订阅类型, K线类型, 代码) -> 异常
+            errors: Dict[Tuple[str, Optional[int], str], Exception] = {}
+            for key, changes in pending.items():
+                sub_type, ktype = key
+                subscribed = self._subscribed.setdefault(key, set())
+                for subscribe in (False, True):
+                    # 只发送相对已订阅状态有净变化的代码
+                    codes = [code for code, flag in changes.items()
+                             if flag == subscribe and (code in subscribed) != subscribe]
+                    for i in range(0, len(codes), MAX_SUB_CODES):
+                        chunk = codes[i:i + MAX_SUB_CODES]
+                        request = {
+                            "type": sub_type if subscribe else _CANCEL_TYPES[sub_type],
+                            "codes": chunk
+                        }
+                        if ktype is not None:
+                            request["kt"] = ktype
+                        try:
+                            await self._send_request(request)
+                        except Exception as e:
+                            for code in chunk:
+                                errors[(sub_type, ktype, code)] = e
+                            continue
+                        if subscribe:
+                            subscribed.update(chunk)
+                        else:
+                            subscribed.difference_update(chunk)
+
+            for future, key, codes in waiters:
+                if future.done():
+                    continue
+                error = next((errors[key + (code,)] for code in codes if key + (code,) in errors), None)
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(None)
 
     async def heartbeat(self):
         """5.1 发送心跳"""
-        await self.websocket.send(json.dumps({"type": WSType.HEARTBEAT.value}))
+        await self._send({"type": WSType.HEARTBEAT.value})
 
     async def subscribe_snapshot(self, codes: List[str]):
         """5.2 订阅实时快照"""
-        if len(codes) > MAX_SUB_CODES:
-            raise QOSAPIError(f"Max subscription count is {MAX_SUB_CODES}")
-        await self._send_request({
-            "type": WSType.SNAPSHOT.value,
-            "codes": codes
-        })
+        await self._queue_subscription(WSType.SNAPSHOT.value, codes, True)
 
     async def unsubscribe_snapshot(self, codes: List[str]):
         """5.2 取消订阅实时快照"""
-        await self._send_request({
-            "type": WSType.SNAPSHOT_CANCEL.value,
-            "codes": codes
-        })
+        await self._queue_subscription(WSType.SNAPSHOT.value, codes, False)
 
     async def subscribe_trades(self, codes: List[str]):
         """5.3 订阅逐笔成交"""
-        if len(codes) > MAX_SUB_CODES:
-            raise QOSAPIError(f"Max subscription count is {MAX_SUB_CODES}")
-        await self._send_request({
-            "type": WSType.TRADE.value,
-            "codes": codes
-        })
+        await self._queue_subscription(WSType.TRADE.value, codes, True)
 
     async def unsubscribe_trades(self, codes: List[str]):
         """5.3 取消订阅逐笔成交"""
-        await self._send_request({
-            "type": WSType.TRADE_CANCEL.value,
-            "codes": codes
-        })
+        await self._queue_subscription(WSType.TRADE.value, codes, False)
 
     async def subscribe_depth(self, codes: List[str]):
         """5.4 订阅盘口数据"""
-        if len(codes) > MAX_SUB_CODES:
-            raise QOSAPIError(f"Max subscription count is {MAX_SUB_CODES}")
-        await self._send_request({
-            "type": WSType.DEPTH.value,
-            "codes": codes
-        })
+        await self._queue_subscription(WSType.DEPTH.value, codes, True)
 
     async def unsubscribe_depth(self, codes: List[str]):
         """5.4 取消订阅盘口数据"""
-        await self._send_request({
-            "type": WSType.DEPTH_CANCEL.value,
-            "codes": codes
-        })
+        await self._queue_subscription(WSType.DEPTH.value, codes, False)
 
     async def subscribe_kline(self, codes: List[str], ktype: int):
         """5.5 订阅K线数据"""
-        if len(codes) > MAX_SUB_CODES:
-            raise QOSAPIError(f"Max subscription count is {MAX_SUB_CODES}")
-        await self._send_request({
-            "type": WSType.KLINE.value,
-            "codes": codes,
-            "kt": ktype
-        })
+        await self._queue_subscription(WSType.KLINE.value, codes, True, ktype)
 
     async def unsubscribe_kline(self, codes: List[str], ktype: int):
         """5.5 取消订阅K线数据"""
-        await self._send_request({
-            "type": WSType.KLINE_CANCEL.value,
-            "codes": codes,
-            "kt": ktype
-        })
+        await self._queue_subscription(WSType.KLINE.value, codes, False, ktype)
 
     async def request_snapshot(self, codes: List[str]) -> List[QuoteSnapshot]:
         """5.6 请求实时快照"""
@@ -7,7 +7,8 @@ setup(
     install_requires=[
         "requests>=2.25.0",
         "websockets>=10.0",
-        "pydantic>=1.8.0"
+        "pydantic>=1.8.0",
+        "numpy>=1.17.0"
     ],
     python_requires=">=3.7",
     author="QOS",